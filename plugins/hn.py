@@ -4,10 +4,16 @@
 
 Usage: boucle hn <item-id> [--raw]
 """
+import http.client
 import json
 import re
 import sys
-import urllib.request
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{}.json"
+HEADERS = {"User-Agent": "Boucle/1.0"}
 
 HIGH_RISK = [
     r"ignore\s+(all\s+)?previous\s+instructions",
@@ -21,38 +27,84 @@ MEDIUM_RISK = [
     r"execute\s+(this\s+)?command", r"credentials?\s*(file|password|secret|key)",
 ]
 
+# Compiled once at import. Each list also gets a single alternation so clean
+# comments (the common case) cost one search per risk level; the per-pattern
+# regexes only run to name what matched. IGNORECASE instead of lowercasing the
+# text also lets mixed-case markers like [INST] match.
+def _compile(patterns):
+    return ([(p, re.compile(p, re.IGNORECASE)) for p in patterns],
+            re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+
+HIGH_RES, HIGH_RE = _compile(HIGH_RISK)
+MEDIUM_RES, MEDIUM_RE = _compile(MEDIUM_RISK)
+# Both levels in one automaton: a clean comment is a single pass over its text.
+RISK_RE = re.compile(f"{HIGH_RE.pattern}|{MEDIUM_RE.pattern}", re.IGNORECASE)
+
+# Tags and whitespace runs both collapse to one space, so one pass does both.
+CLEAN_RE = re.compile(r"(?:<[^>]+>|\s)+")
+
+# One keep-alive HTTPS connection per (thread, host), so the many small item
+# fetches skip a TCP + TLS handshake each.
+_tls = threading.local()
+
+def _connection(host):
+    conns = _tls.__dict__.setdefault("conns", {})
+    if host not in conns:
+        conns[host] = http.client.HTTPSConnection(host, timeout=10)
+    return conns[host]
+
 def fetch(url):
-    try:
-        req = urllib.request.Request(url)
-        req.add_header("User-Agent", "Boucle/1.0")
-        return json.loads(urllib.request.urlopen(req, timeout=10).read().decode())
-    except Exception:
-        return None
+    parts = urllib.parse.urlsplit(url)
+    conn = _connection(parts.netloc)
+    for _ in range(2):
+        try:
+            conn.request("GET", parts.path, headers=HEADERS)
+            resp = conn.getresponse()
+            body = resp.read()
+            return json.loads(body) if resp.status == 200 else None
+        except (http.client.HTTPException, OSError):
+            conn.close()  # stale keep-alive: the retry reconnects
+        except Exception:
+            return None
+    return None
 
 def check(text):
-    if not text:
+    if not text or not RISK_RE.search(text):
         return "clean", []
-    low = text.lower()
-    found = [(p, "HIGH") for p in HIGH_RISK if re.search(p, low)]
-    found += [(p, "MEDIUM") for p in MEDIUM_RISK if re.search(p, low)]
-    if any(l == "HIGH" for _, l in found):
-        return "HIGH", [p for p, _ in found]
-    if found:
-        return "MEDIUM", [p for p, _ in found]
-    return "clean", []
-
-def get_comments(item_id, depth=0, max_depth=3):
-    if depth > max_depth:
-        return []
-    item = fetch(f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json")
-    if not item or item.get("dead") or item.get("deleted"):
-        return []
+    high, medium = HIGH_RE.search(text), MEDIUM_RE.search(text)
+    found = [p for p, r in HIGH_RES if high and r.search(text)]
+    found += [p for p, r in MEDIUM_RES if medium and r.search(text)]
+    return ("HIGH" if high else "MEDIUM"), found
+
+def get_comments(kids, max_depth=3, workers=16):
+    """Fetch the comment trees under `kids`, one parallel round per depth level.
+
+    Returns comments in the same depth-first order a serial walk would."""
+    items, frontier = {}, list(kids)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(max_depth + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for kid, item in zip(frontier, pool.map(lambda i: fetch(ITEM_URL.format(i)), frontier)):
+                if not item or item.get("dead") or item.get("deleted"):
+                    continue
+                items[kid] = item
+                next_frontier.extend(item.get("kids", []))
+            frontier = next_frontier
+
     comments = []
-    if item.get("type") == "comment" and item.get("text"):
-        comments.append({"id": item["id"], "by": item.get("by", "?"),
-            "text": item["text"], "depth": depth})
-    for kid in item.get("kids", []):
-        comments.extend(get_comments(kid, depth + 1, max_depth))
+    def walk(ids, depth):
+        for kid in ids:
+            item = items.get(kid)
+            if not item:
+                continue
+            if item.get("type") == "comment" and item.get("text"):
+                comments.append({"id": item["id"], "by": item.get("by", "?"),
+                    "text": item["text"], "depth": depth})
+            if depth < max_depth:
+                walk(item.get("kids", []), depth + 1)
+    walk(kids, 0)
     return comments
 
 def main():
@@ -60,7 +112,7 @@ def main():
         print(__doc__); sys.exit(1)
 
     item_id, raw = sys.argv[1], "--raw" in sys.argv
-    post = fetch(f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json")
+    post = fetch(ITEM_URL.format(item_id))
     if not post:
         print("Could not fetch post."); sys.exit(1)
 
@@ -70,16 +122,12 @@ def main():
         print("[DEAD]")
     print()
 
-    comments = []
-    for kid in post.get("kids", []):
-        comments.extend(get_comments(kid))
-
+    comments = get_comments(post.get("kids", []))
     if not comments:
         print("(No comments)"); return
 
     for c in comments:
-        text = re.sub(r"<[^>]+>", " ", c["text"]).strip()
-        text = re.sub(r"\s+", " ", text)
+        text = CLEAN_RE.sub(" ", c["text"]).strip()
         level, patterns = check(text)
         indent = "  " * c["depth"]
         if level == "HIGH" and not raw:
@@ -8,38 +8,114 @@ Commands:
     close <identifier>
     update <identifier> [state] [assignee]
     comment <identifier> <body>
-    batch  (reads JSON from stdin)
+    batch  (reads ops from stdin: one JSON object per line, or a JSON array)
 """
+import functools
+import hashlib
+import http.client
 import json
 import os
 import subprocess
 import sys
-import urllib.request
+import time
 
 ROOT = os.environ.get("BOUCLE_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# auth-linear.sh output is cached on disk for an hour so repeated `boucle linear`
+# calls skip the fork + shell startup; a 401 from the API drops the cache. The
+# file is per agent root, since each root has its own auth-linear.sh.
+ROOT_KEY = hashlib.sha256(os.path.abspath(ROOT).encode()).hexdigest()[:16]
+TOKEN_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "boucle", f"linear-{ROOT_KEY}.token")
+TOKEN_TTL = 3600
+
+def read_cached_token():
+    try:
+        if time.time() - os.path.getmtime(TOKEN_CACHE) < TOKEN_TTL:
+            with open(TOKEN_CACHE) as f:
+                return f.read().strip()
+    except OSError:
+        pass
+    return ""
+
+def write_cached_token(token):
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE), mode=0o700, exist_ok=True)
+        tmp = f"{TOKEN_CACHE}.{os.getpid()}"
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            f.write(token)
+        os.replace(tmp, TOKEN_CACHE)
+    except OSError:
+        pass
+
+def forget_cached_token():
+    get_token.cache_clear()
+    try:
+        os.remove(TOKEN_CACHE)
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=1)
 def get_token():
+    token = read_cached_token()
+    if token:
+        return token
     result = subprocess.run(
         [os.path.join(ROOT, "auth-linear.sh")],
         capture_output=True, text=True, cwd=ROOT
     )
-    return result.stdout.strip()
+    token = result.stdout.strip()
+    if token:
+        write_cached_token(token)
+    return token
+
+_conn = None
+# Whether _conn has completed a request, i.e. may be a stale keep-alive.
+_conn_reused = False
+
+def _connection():
+    """Keep-alive HTTPS connection shared by every gql() call in this process."""
+    global _conn
+    if _conn is None:
+        _conn = http.client.HTTPSConnection("api.linear.app")
+    return _conn
 
 def gql(token, query, variables=None):
     payload = {"query": query}
     if variables:
         payload["variables"] = variables
-    data = json.dumps(payload).encode()
-    req = urllib.request.Request("https://api.linear.app/graphql", data=data)
-    req.add_header("Authorization", f"Bearer {token}")
-    req.add_header("Content-Type", "application/json")
-    try:
-        resp = urllib.request.urlopen(req)
-        return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        print(f"HTTP {e.code}: {body}", file=sys.stderr)
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    global _conn_reused
+    conn = _connection()
+    for attempt in range(2):
+        reused = _conn_reused
+        try:
+            conn.request("POST", "/graphql", body=data, headers=headers)
+        except (BrokenPipeError, ConnectionResetError):
+            # The server closed the idle keep-alive before we finished sending,
+            # so it can't have acted on the request: resend on a fresh one.
+            conn.close()
+            _conn_reused = False
+            if attempt or not reused:
+                raise
+            continue
+        # Past this point the server may have run the request (batches are
+        # mutations), so failures are never retried.
+        try:
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _conn_reused = False
+            raise
+        _conn_reused = True
+        break
+    if resp.status != 200:
+        if resp.status == 401:
+            forget_cached_token()
+        print(f"HTTP {resp.status}: {body.decode(errors='replace')}", file=sys.stderr)
         return None
+    return json.loads(body)
 
 MY_ID = "ebe9606d-ebc9-47f3-8631-bd1883301b0f"
 THOMAS_ID = "a91ec4a2-da86-48b9-8e3e-09f87fe50e63"
@@ -58,25 +134,37 @@ ASSIGNEE_ALIASES = {"self": MY_ID, "thomas": THOMAS_ID}
 def resolve_assignee(name):
     return ASSIGNEE_ALIASES.get(name, name) if name else None
 
-def find_issue_id(token, identifier):
+def parse_identifier(identifier):
+    """Split "ENG-123" into ("ENG", 123), or print why it can't be and return None."""
     parts = identifier.split("-")
     if len(parts) != 2:
         print(f"Invalid identifier: {identifier}", file=sys.stderr)
         return None
     try:
-        number = int(parts[1])
+        return parts[0], int(parts[1])
     except ValueError:
         print(f"Invalid issue number: {parts[1]}", file=sys.stderr)
         return None
+
+# identifier -> issue id, shared by single lookups and batch chunks.
+ID_CACHE = {}
+
+def find_issue_id(token, identifier):
+    if identifier in ID_CACHE:
+        return ID_CACHE[identifier]
+    parsed = parse_identifier(identifier)
+    if not parsed:
+        return None
     result = gql(token, """
         query FindIssue($teamKey: String!, $number: Float!) {
             issues(filter: { team: { key: { eq: $teamKey } }, number: { eq: $number } }) {
                 nodes { id identifier title }
             }
         }
-    """, {"teamKey": parts[0], "number": number})
+    """, {"teamKey": parsed[0], "number": parsed[1]})
     nodes = (result or {}).get("data", {}).get("issues", {}).get("nodes", [])
     if nodes:
+        ID_CACHE[identifier] = nodes[0]["id"]
         return nodes[0]["id"]
     print(f"Issue not found: {identifier}", file=sys.stderr)
     return None
@@ -95,7 +183,7 @@ def close_issue(token, identifier):
     if result:
         print(f"Closed: {identifier}")
 
-def create_issue(token, title, description="", state="backlog", assignee=None, priority=None):
+def create_input(title, description="", state="backlog", assignee=None, priority=None):
     input_data = {
         "teamId": TEAM_ID,
         "title": title,
@@ -106,6 +194,18 @@ def create_issue(token, title, description="", state="backlog", assignee=None, p
         input_data["assigneeId"] = resolve_assignee(assignee)
     if priority:
         input_data["priority"] = int(priority)
+    return input_data
+
+def update_input(state=None, assignee=None):
+    input_data = {}
+    if state and state in STATES:
+        input_data["stateId"] = STATES[state]
+    if assignee:
+        input_data["assigneeId"] = resolve_assignee(assignee)
+    return input_data
+
+def create_issue(token, title, description="", state="backlog", assignee=None, priority=None):
+    input_data = create_input(title, description, state, assignee, priority)
     result = gql(token, """
         mutation($input: IssueCreateInput!) {
             issueCreate(input: $input) {
@@ -123,11 +223,7 @@ def update_issue(token, identifier, state=None, assignee=None):
     issue_id = find_issue_id(token, identifier)
     if not issue_id:
         return
-    input_data = {}
-    if state and state in STATES:
-        input_data["stateId"] = STATES[state]
-    if assignee:
-        input_data["assigneeId"] = resolve_assignee(assignee)
+    input_data = update_input(state, assignee)
     if not input_data:
         print("Nothing to update")
         return
@@ -157,6 +253,102 @@ def add_comment(token, identifier, body):
     if result:
         print(f"Comment added to {identifier}")
 
+def find_issue_ids(token, identifiers):
+    """Resolve many identifiers with one aliased query. Returns {identifier: id}."""
+    found, wanted = {}, {}
+    for identifier in dict.fromkeys(identifiers):
+        if identifier in ID_CACHE:
+            found[identifier] = ID_CACHE[identifier]
+            continue
+        parsed = parse_identifier(identifier)
+        if parsed:
+            wanted[identifier] = parsed
+    if not wanted:
+        return found
+    decls, fields, variables = [], [], {}
+    for n, (team_key, number) in enumerate(wanted.values()):
+        decls.append(f"$k{n}: String!, $n{n}: Float!")
+        fields.append(f"i{n}: issues(filter: {{ team: {{ key: {{ eq: $k{n} }} }}, number: {{ eq: $n{n} }} }}) {{ nodes {{ id }} }}")
+        variables[f"k{n}"], variables[f"n{n}"] = team_key, number
+    result = gql(token, f"query FindIssues({', '.join(decls)}) {{ {' '.join(fields)} }}", variables)
+    data = (result or {}).get("data") or {}
+    for n, identifier in enumerate(wanted):
+        nodes = (data.get(f"i{n}") or {}).get("nodes", [])
+        if nodes:
+            found[identifier] = ID_CACHE[identifier] = nodes[0]["id"]
+        else:
+            print(f"Issue not found: {identifier}", file=sys.stderr)
+    return found
+
+BATCH_SIZE = 25
+
+def read_ops(stream):
+    """Yield ops as they arrive: one JSON object per line, or a single JSON array."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("["):
+            yield from json.loads(line + stream.read())
+            return
+        yield json.loads(line)
+
+def run_batch(token, ops):
+    """Run ops with one lookup query for every identifier and one multi-mutation
+    document, instead of one or two round-trips per op."""
+    issue_ids = find_issue_ids(token, [o["identifier"] for o in ops if o["type"] in ("close", "update", "comment")])
+    decls, fields, variables, reports = [], [], {}, []
+    for n, o in enumerate(ops):
+        if o["type"] == "create":
+            decls.append(f"$input{n}: IssueCreateInput!")
+            fields.append(f"m{n}: issueCreate(input: $input{n}) {{ success issue {{ identifier title url }} }}")
+            variables[f"input{n}"] = create_input(o["title"], o.get("description", ""), o.get("state", "backlog"), o.get("assignee"), o.get("priority"))
+        elif o["type"] in ("close", "update", "comment"):
+            issue_id = issue_ids.get(o["identifier"])
+            if not issue_id:
+                continue
+            if o["type"] == "comment":
+                decls.append(f"$id{n}: String!, $body{n}: String!")
+                fields.append(f"m{n}: commentCreate(input: {{ issueId: $id{n}, body: $body{n} }}) {{ success }}")
+                variables[f"id{n}"], variables[f"body{n}"] = issue_id, o["body"]
+            else:
+                input_data = {"stateId": STATES["completed"]} if o["type"] == "close" else update_input(o.get("state"), o.get("assignee"))
+                if not input_data:
+                    print("Nothing to update")
+                    continue
+                decls.append(f"$id{n}: String!, $input{n}: IssueUpdateInput!")
+                fields.append(f"m{n}: issueUpdate(id: $id{n}, input: $input{n}) {{ success issue {{ identifier title state {{ name }} }} }}")
+                variables[f"id{n}"], variables[f"input{n}"] = issue_id, input_data
+        else:
+            print(f"Unknown: {o['type']}")
+            continue
+        reports.append((f"m{n}", o))
+    if not fields:
+        return
+    result = gql(token, f"mutation Batch({', '.join(decls)}) {{ {' '.join(fields)} }}", variables)
+    if not result:
+        return
+    for error in result.get("errors") or []:
+        print(f"Error: {error.get('message', error)}", file=sys.stderr)
+    data = result.get("data") or {}
+    for alias, o in reports:
+        payload = data.get(alias)
+        issue = (payload or {}).get("issue")
+        if o["type"] == "create":
+            if issue:
+                print(f"Created: {issue['identifier']} — {issue['title']}")
+            else:
+                print(f"Failed to create issue", file=sys.stderr)
+        elif not payload:
+            continue
+        elif o["type"] == "close":
+            print(f"Closed: {o['identifier']}")
+        elif o["type"] == "update" and issue:
+            state_name = issue.get("state", {}).get("name", "?")
+            print(f"Updated: {issue['identifier']} — {issue['title']} (state: {state_name})")
+        elif o["type"] == "comment":
+            print(f"Comment added to {o['identifier']}")
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print(__doc__)
@@ -178,12 +370,16 @@ if __name__ == "__main__":
     elif cmd == "comment":
         add_comment(token, args[0], args[1])
     elif cmd == "batch":
-        for op in json.loads(sys.stdin.read()):
-            {"create": lambda o: create_issue(token, o["title"], o.get("description", ""), o.get("state", "backlog"), o.get("assignee"), o.get("priority")),
-             "close": lambda o: close_issue(token, o["identifier"]),
-             "update": lambda o: update_issue(token, o["identifier"], o.get("state"), o.get("assignee")),
-             "comment": lambda o: add_comment(token, o["identifier"], o["body"]),
-            }.get(op["type"], lambda o: print(f"Unknown: {o['type']}"))(op)
+        # Flush every BATCH_SIZE ops so work starts before stdin hits EOF and
+        # each mutation document stays small.
+        chunk = []
+        for op in read_ops(sys.stdin):
+            chunk.append(op)
+            if len(chunk) == BATCH_SIZE:
+                run_batch(token, chunk)
+                chunk = []
+        if chunk:
+            run_batch(token, chunk)
     else:
         print(f"Unknown command: {cmd}", file=sys.stderr)
         print(__doc__)
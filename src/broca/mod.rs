@@ -150,10 +150,18 @@ pub fn show(memory_dir: &Path, entry_name: &str) -> Result<String, BrocaError> {
 
 /// Search entries by tag.
 pub fn search_tag(memory_dir: &Path, tag: &str) -> Result<Vec<Entry>, BrocaError> {
+    search_tags(memory_dir, &[tag.to_string()])
+}
+
+/// Search entries that carry every one of `tags` (case-insensitive).
+pub fn search_tags(memory_dir: &Path, tags: &[String]) -> Result<Vec<Entry>, BrocaError> {
     let entries = entry::load_all(&memory_dir.join("knowledge"))?;
     Ok(entries
         .into_iter()
-        .filter(|e| e.tags.iter().any(|t| t.eq_ignore_ascii_case(tag)))
+        .filter(|e| {
+            tags.iter()
+                .all(|tag| e.tags.iter().any(|t| t.eq_ignore_ascii_case(tag)))
+        })
         .collect())
 }
 
@@ -312,40 +320,88 @@ pub fn relate(
     entry_b: &str,
     relation_type: &str,
 ) -> Result<(), BrocaError> {
+    let edge = (
+        entry_a.to_string(),
+        entry_b.to_string(),
+        relation_type.to_string(),
+    );
+    relate_many(memory_dir, &[edge])?.pop().unwrap_or(Ok(()))
+}
+
+/// Add many `(from, to, relation_type)` relationships in one pass.
+///
+/// The knowledge directory is listed once and RELATIONS.md is read and
+/// written once, instead of once per edge. Returns one result per edge, in
+/// order: an edge naming a missing entry fails on its own and the rest are
+/// still stored.
+pub fn relate_many(
+    memory_dir: &Path,
+    edges: &[(String, String, String)],
+) -> Result<Vec<Result<(), BrocaError>>, BrocaError> {
     let knowledge_dir = memory_dir.join("knowledge");
 
-    // Verify both entries exist
-    let path_a = find_entry_by_name(&knowledge_dir, entry_a)?
-        .ok_or_else(|| BrocaError::Parse(format!("Entry not found: {entry_a}")))?;
-    let path_b = find_entry_by_name(&knowledge_dir, entry_b)?
-        .ok_or_else(|| BrocaError::Parse(format!("Entry not found: {entry_b}")))?;
-
-    let name_a = path_a
-        .file_name()
-        .and_then(|f| f.to_str())
-        .unwrap_or(entry_a);
-    let name_b = path_b
-        .file_name()
-        .and_then(|f| f.to_str())
-        .unwrap_or(entry_b);
+    let mut names = Vec::new();
+    if knowledge_dir.exists() {
+        for entry in fs::read_dir(&knowledge_dir)? {
+            if let Some(fname) = entry?.file_name().to_str() {
+                names.push(fname.to_string());
+            }
+        }
+    }
+    let lowered: Vec<String> = names.iter().map(|n| n.to_lowercase()).collect();
+    // Same matching rule as find_entry_by_name: first filename containing the name.
+    let find = |name: &str| {
+        let name_lower = name.to_lowercase();
+        lowered
+            .iter()
+            .position(|n| n.contains(&name_lower))
+            .map(|i| names[i].as_str())
+    };
 
     // Store relationships in a RELATIONS.md file
     let relations_path = memory_dir.join("RELATIONS.md");
-    let relation_line = format!("{name_a} --[{relation_type}]--> {name_b}\n");
+    let exists = relations_path.exists();
+    let mut relations = if exists {
+        fs::read_to_string(&relations_path)?
+    } else {
+        String::new()
+    };
+    let mut changed = false;
+
+    let mut results = Vec::with_capacity(edges.len());
+    for (entry_a, entry_b, relation_type) in edges {
+        let (name_a, name_b) = match (find(entry_a), find(entry_b)) {
+            (Some(a), Some(b)) => (a, b),
+            (None, _) => {
+                results.push(Err(BrocaError::Parse(format!(
+                    "Entry not found: {entry_a}"
+                ))));
+                continue;
+            }
+            (_, None) => {
+                results.push(Err(BrocaError::Parse(format!(
+                    "Entry not found: {entry_b}"
+                ))));
+                continue;
+            }
+        };
 
-    if relations_path.exists() {
-        let existing = fs::read_to_string(&relations_path)?;
-        if !existing.contains(relation_line.trim()) {
-            fs::write(&relations_path, format!("{existing}{relation_line}"))?;
+        let relation_line = format!("{name_a} --[{relation_type}]--> {name_b}\n");
+        if !relations.contains(relation_line.trim()) {
+            if !exists && !changed {
+                relations.push_str("# Broca Relations\n\n");
+            }
+            relations.push_str(&relation_line);
+            changed = true;
         }
-    } else {
-        fs::write(
-            &relations_path,
-            format!("# Broca Relations\n\n{relation_line}"),
-        )?;
+        results.push(Ok(()));
     }
 
-    Ok(())
+    if changed {
+        fs::write(&relations_path, relations)?;
+    }
+
+    Ok(results)
 }
 
 // --- Helpers ---
@@ -604,6 +660,38 @@ mod tests {
         assert_eq!(results[0].title, "Tagged");
     }
 
+    #[test]
+    fn test_search_tags_requires_all() {
+        let dir = tempfile::tempdir().unwrap();
+        let memory_dir = dir.path();
+
+        remember(
+            memory_dir,
+            "fact",
+            "Both",
+            "Content",
+            &["quantum".to_string(), "analysis".to_string()],
+            None,
+        )
+        .unwrap();
+        remember(
+            memory_dir,
+            "fact",
+            "One",
+            "Content",
+            &["quantum".to_string()],
+            None,
+        )
+        .unwrap();
+
+        let tags = ["quantum".to_string(), "Analysis".to_string()];
+        let results = search_tags(memory_dir, &tags).unwrap();
+        assert_eq!(results.len(), 1);
+        assert_eq!(results[0].title, "Both");
+
+        assert_eq!(search_tags(memory_dir, &tags[..1]).unwrap().len(), 2);
+    }
+
     #[test]
     fn test_update_confidence() {
         let dir = tempfile::tempdir().unwrap();
@@ -653,6 +741,38 @@ mod tests {
         assert!(relations.contains("--[supports]-->"));
     }
 
+    #[test]
+    fn test_relate_many() {
+        let dir = tempfile::tempdir().unwrap();
+        let memory_dir = dir.path();
+
+        remember(memory_dir, "fact", "Entry A", "Content A", &[], None).unwrap();
+        remember(memory_dir, "fact", "Entry B", "Content B", &[], None).unwrap();
+
+        let edge = |a: &str, b: &str, t: &str| (a.to_string(), b.to_string(), t.to_string());
+        let results = relate_many(
+            memory_dir,
+            &[
+                edge("entry-a", "entry-b", "leads_to"),
+                edge("entry-a", "missing", "leads_to"),
+                edge("entry-b", "entry-a", "similar_to"),
+                edge("entry-a", "entry-b", "leads_to"),
+            ],
+        )
+        .unwrap();
+
+        assert_eq!(results.len(), 4);
+        assert!(results[0].is_ok());
+        assert!(results[1].is_err());
+        assert!(results[2].is_ok());
+        assert!(results[3].is_ok());
+
+        let relations = fs::read_to_string(memory_dir.join("RELATIONS.md")).unwrap();
+        assert!(relations.starts_with("# Broca Relations"));
+        assert_eq!(relations.matches("--[leads_to]-->").count(), 1);
+        assert_eq!(relations.matches("--[similar_to]-->").count(), 1);
+    }
+
     #[test]
     fn test_replace_frontmatter_field() {
         let content = "---\ntype: fact\nconfidence: 0.8\n---\n\nContent.";
@@ -9,12 +9,19 @@ use crate::runner::context::validate_external_content;
 use serde::{Deserialize, Serialize};
 use serde_json::{json, Value};
 use std::error::Error;
-use std::io::{self, BufRead, BufReader, Write};
+use std::io::{self, BufRead, BufReader, BufWriter, Write};
 use std::path::{Path, PathBuf};
 use std::{fs, process};
 
 const MCP_VERSION: &str = "2025-11-25";
 
+/// Buffer size for the stdio transport, sized for large batch payloads.
+const STDIO_BUFFER_SIZE: usize = 64 * 1024;
+
+/// Requested kernel pipe capacity for stdin/stdout (Linux default is 64 KiB).
+#[cfg(target_os = "linux")]
+const PIPE_CAPACITY: libc::c_int = 1 << 20;
+
 #[derive(Debug, Serialize, Deserialize)]
 struct JsonRpcMessage {
     jsonrpc: String,
@@ -58,52 +65,134 @@ pub async fn serve(
     eprintln!("Transport: stdio");
     eprintln!("Waiting for initialization...");
 
+    grow_stdio_pipes();
+
+    // Messages stay newline-delimited (the MCP stdio framing), but both ends
+    // are buffered: each response goes out as a single write + flush instead
+    // of LineWriter's separate body/newline writes, and the input line buffer
+    // is reused rather than reallocated per message.
     let stdin = io::stdin();
-    let mut reader = BufReader::new(stdin.lock());
-    let mut stdout = io::stdout();
+    let mut reader = BufReader::with_capacity(STDIO_BUFFER_SIZE, stdin.lock());
+    let mut stdout = BufWriter::with_capacity(STDIO_BUFFER_SIZE, io::stdout().lock());
 
     let mut line = String::new();
     while reader.read_line(&mut line)? > 0 {
-        line = line.trim().to_string();
-        if line.is_empty() {
-            line.clear();
-            continue;
+        let payload = line.trim();
+        if !payload.is_empty() {
+            if let Some(response_json) = handle_payload(payload, root, config).await? {
+                stdout.write_all(response_json.as_bytes())?;
+                stdout.write_all(b"\n")?;
+                stdout.flush()?;
+            }
+        }
+
+        line.clear();
+    }
+
+    Ok(())
+}
+
+/// Grow the stdin/stdout pipes so large payloads (batches, long syntheses)
+/// cross in fewer read/write calls and a slow reader stalls the writer less.
+/// Best effort: a no-op when stdio isn't a pipe or the request exceeds
+/// /proc/sys/fs/pipe-max-size.
+#[cfg(target_os = "linux")]
+fn grow_stdio_pipes() {
+    for fd in [libc::STDIN_FILENO, libc::STDOUT_FILENO] {
+        unsafe {
+            libc::fcntl(fd, libc::F_SETPIPE_SZ, PIPE_CAPACITY);
+        }
+    }
+}
+
+#[cfg(not(target_os = "linux"))]
+fn grow_stdio_pipes() {}
+
+/// Handle one line of input: either a single JSON-RPC message or a batch
+/// (a JSON array of messages, JSON-RPC 2.0 section 6). Batches are answered
+/// with a single array so clients pay one stdio round-trip per batch.
+/// Returns `None` when nothing needs to be written (notifications only).
+async fn handle_payload(
+    payload: &str,
+    root: &Path,
+    config: &Config,
+) -> Result<Option<String>, Box<dyn Error>> {
+    let value = match serde_json::from_str::<Value>(payload) {
+        Ok(value) => value,
+        Err(e) => {
+            eprintln!("Failed to parse JSON-RPC message: {}", e);
+            let error_response = rpc_error(None, -32700, "Parse error", Some(json!(e.to_string())));
+            return Ok(Some(serde_json::to_string(&error_response)?));
         }
+    };
+
+    match value {
+        Value::Array(items) => {
+            if items.is_empty() {
+                let error_response = rpc_error(None, -32600, "Invalid Request", None);
+                return Ok(Some(serde_json::to_string(&error_response)?));
+            }
 
-        match serde_json::from_str::<JsonRpcMessage>(&line) {
-            Ok(message) => {
-                let response = handle_message(message, root, config).await?;
-                if let Some(response) = response {
-                    let response_json = serde_json::to_string(&response)?;
-                    writeln!(stdout, "{}", response_json)?;
-                    stdout.flush()?;
+            let mut responses = Vec::with_capacity(items.len());
+            for item in items {
+                if let Some(response) = handle_value(item, root, config).await? {
+                    responses.push(response);
                 }
             }
-            Err(e) => {
-                eprintln!("Failed to parse JSON-RPC message: {}", e);
-                // Send parse error response
-                let error_response = JsonRpcMessage {
-                    jsonrpc: "2.0".to_string(),
-                    id: None,
-                    method: None,
-                    params: None,
-                    result: None,
-                    error: Some(JsonRpcError {
-                        code: -32700,
-                        message: "Parse error".to_string(),
-                        data: Some(json!(e.to_string())),
-                    }),
-                };
-                let response_json = serde_json::to_string(&error_response)?;
-                writeln!(stdout, "{}", response_json)?;
-                stdout.flush()?;
+
+            if responses.is_empty() {
+                Ok(None)
+            } else {
+                Ok(Some(serde_json::to_string(&responses)?))
             }
         }
+        value => match handle_value(value, root, config).await? {
+            Some(response) => Ok(Some(serde_json::to_string(&response)?)),
+            None => Ok(None),
+        },
+    }
+}
 
-        line.clear();
+/// Decode a single JSON-RPC message and dispatch it.
+async fn handle_value(
+    value: Value,
+    root: &Path,
+    config: &Config,
+) -> Result<Option<JsonRpcMessage>, Box<dyn Error>> {
+    match serde_json::from_value::<JsonRpcMessage>(value) {
+        Ok(message) => {
+            // Notifications (no id) never get a reply, including inside batches.
+            let is_notification = message.id.is_none();
+            let response = handle_message(message, root, config).await?;
+            Ok(if is_notification { None } else { response })
+        }
+        Err(e) => {
+            eprintln!("Invalid JSON-RPC message: {}", e);
+            Ok(Some(rpc_error(
+                None,
+                -32600,
+                "Invalid Request",
+                Some(json!(e.to_string())),
+            )))
+        }
     }
+}
 
-    Ok(())
+/// Build a JSON-RPC error response. Without a request id the response
+/// carries `"id": null`, as JSON-RPC 2.0 requires.
+fn rpc_error(id: Option<Value>, code: i32, message: &str, data: Option<Value>) -> JsonRpcMessage {
+    JsonRpcMessage {
+        jsonrpc: "2.0".to_string(),
+        id: Some(id.unwrap_or(Value::Null)),
+        method: None,
+        params: None,
+        result: None,
+        error: Some(JsonRpcError {
+            code,
+            message: message.to_string(),
+            data,
+        }),
+    }
 }
 
 async fn handle_message(
@@ -188,6 +277,13 @@ fn handle_tools_list(
                     "valid_until": { "type": "string", "description": "Optional freshness date, YYYYMMDD or YYYY-MM-DD. Recall warns after this date." }
                 },
                 "required": ["content"]
+            },
+            "outputSchema": {
+                "type": "object",
+                "properties": {
+                    "id": { "type": "string", "description": "ID of the stored memory, usable with broca_relate and broca_show" }
+                },
+                "required": ["id"]
             }
         }),
         json!({
@@ -198,7 +294,8 @@ fn handle_tools_list(
                 "type": "object",
                 "properties": {
                     "query": { "type": "string", "description": "Search query to find relevant memories" },
-                    "limit": { "type": "integer", "description": "Maximum number of results to return", "default": 10, "minimum": 1, "maximum": 100 }
+                    "limit": { "type": "integer", "description": "Maximum number of results to return", "default": 10, "minimum": 1, "maximum": 100 },
+                    "fields": { "type": "array", "items": { "type": "string", "enum": ["id", "title", "tags", "content"] }, "description": "Only return these fields per entry (the ID is always included). Default: all" }
                 },
                 "required": ["query"]
             }
@@ -230,6 +327,30 @@ fn handle_tools_list(
                 "required": ["from_id", "to_id", "relation_type"]
             }
         }),
+        json!({
+            "name": "broca_relate_many",
+            "title": "Create Relationships",
+            "description": "Create many relationships between memories in one call",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "edges": {
+                        "type": "array",
+                        "description": "Relationships to create, each shaped like broca_relate's arguments",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "from_id": { "type": "string", "description": "ID of the source memory" },
+                                "to_id": { "type": "string", "description": "ID of the target memory" },
+                                "relation_type": { "type": "string", "enum": ["related_to", "caused_by", "leads_to", "similar_to", "contradicts", "elaborates_on"], "description": "Type of relationship between memories" }
+                            },
+                            "required": ["from_id", "to_id", "relation_type"]
+                        }
+                    }
+                },
+                "required": ["edges"]
+            }
+        }),
         json!({
             "name": "broca_supersede",
             "title": "Supersede Memory",
@@ -252,12 +373,13 @@ fn handle_tools_list(
         json!({
             "name": "broca_search_tags",
             "title": "Search by Tags",
-            "description": "Search memories by specific tags",
+            "description": "Search memories carrying all of the given tags",
             "inputSchema": {
                 "type": "object",
                 "properties": {
-                    "tags": { "type": "array", "items": {"type": "string"}, "description": "Tags to search for" },
-                    "limit": { "type": "integer", "description": "Maximum number of results to return", "default": 10, "minimum": 1, "maximum": 100 }
+                    "tags": { "type": "array", "items": {"type": "string"}, "description": "Tags to search for; entries must have every one" },
+                    "limit": { "type": "integer", "description": "Maximum number of results to return", "default": 10, "minimum": 1, "maximum": 100 },
+                    "fields": { "type": "array", "items": { "type": "string", "enum": ["id", "title", "tags", "content"] }, "description": "Only return these fields per entry (the ID is always included). Default: all" }
                 },
                 "required": ["tags"]
             }
@@ -360,11 +482,21 @@ async fn handle_tools_call(
     let default_args = json!({});
     let arguments = params.get("arguments").unwrap_or(&default_args);
 
+    // Tools with an outputSchema also return machine-readable structuredContent,
+    // so clients don't have to parse IDs back out of the text.
+    let mut structured = None;
     let result = match tool_name {
-        "broca_remember" => handle_broca_remember(arguments, root, config).await,
+        "broca_remember" => handle_broca_remember(arguments, root, config)
+            .await
+            .map(|id| {
+                let text = format!("Stored memory with ID: {}", id);
+                structured = Some(json!({ "id": id }));
+                text
+            }),
         "broca_recall" => handle_broca_recall(arguments, root, config).await,
         "broca_journal" => handle_broca_journal(arguments, root, config).await,
         "broca_relate" => handle_broca_relate(arguments, root, config).await,
+        "broca_relate_many" => handle_broca_relate_many(arguments, root, config).await,
         "broca_supersede" => handle_broca_supersede(arguments, root, config).await,
         "broca_stats" => handle_broca_stats(root, config).await,
         "broca_search_tags" => handle_broca_search_tags(arguments, root, config).await,
@@ -396,7 +528,7 @@ async fn handle_tools_call(
 
     match result {
         Ok(content) => {
-            let result = json!({
+            let mut result = json!({
                 "content": [
                     {
                         "type": "text",
@@ -405,6 +537,9 @@ async fn handle_tools_call(
                 ],
                 "isError": false
             });
+            if let Some(structured) = structured {
+                result["structuredContent"] = structured;
+            }
 
             Ok(Some(JsonRpcMessage {
                 jsonrpc: "2.0".to_string(),
@@ -438,6 +573,7 @@ async fn handle_tools_call(
     }
 }
 
+/// Store a memory and return its ID.
 async fn handle_broca_remember(
     arguments: &Value,
     root: &Path,
@@ -478,13 +614,11 @@ async fn handle_broca_remember(
         valid_until,
     )?;
 
-    Ok(format!(
-        "Stored memory with ID: {}",
-        entry_path
-            .file_stem()
-            .and_then(|f| f.to_str())
-            .unwrap_or("unknown")
-    ))
+    Ok(entry_path
+        .file_stem()
+        .and_then(|f| f.to_str())
+        .unwrap_or("unknown")
+        .to_string())
 }
 
 async fn handle_broca_recall(
@@ -501,6 +635,8 @@ async fn handle_broca_recall(
         .and_then(|v| v.as_u64())
         .unwrap_or(10) as usize;
 
+    let fields = EntryFields::from_arguments(arguments);
+
     let memory_dir = root.join(&config.memory.dir);
     let results = broca::recall(&memory_dir, query, limit)?;
 
@@ -510,14 +646,9 @@ async fn handle_broca_recall(
         let mut output = format!("Found {} memory(ies):\n\n", results.len());
 
         for (i, entry) in results.iter().enumerate() {
-            output.push_str(&format!(
-                "{}. **{}** ({})\n",
-                i + 1,
-                entry.title,
-                entry.filename
-            ));
+            fields.push_heading(&mut output, i + 1, &entry.title, &entry.filename);
 
-            if !entry.tags.is_empty() {
+            if fields.tags && !entry.tags.is_empty() {
                 output.push_str(&format!("   Tags: {}\n", entry.tags.join(", ")));
             }
             if let Some(ttl_days) = entry.ttl_days {
@@ -530,18 +661,64 @@ async fn handle_broca_recall(
                 output.push_str(&format!("   Stale: {stale_reason}\n"));
             }
 
-            let preview = if entry.content.len() > 200 {
-                format!("{}...", &entry.content[..200])
-            } else {
-                entry.content.clone()
-            };
-            output.push_str(&format!("   {}\n\n", preview));
+            fields.push_preview(&mut output, &entry.content);
         }
 
         Ok(output)
     }
 }
 
+/// Per-entry fields requested through the optional `fields` argument of the
+/// listing tools. Clients that only need IDs and tags (e.g. to build a
+/// relationship graph) can skip titles and content previews. The entry ID is
+/// always shown, and so are freshness warnings.
+struct EntryFields {
+    title: bool,
+    tags: bool,
+    content: bool,
+}
+
+impl EntryFields {
+    fn from_arguments(arguments: &Value) -> Self {
+        match arguments.get("fields").and_then(|v| v.as_array()) {
+            Some(fields) => {
+                let has = |name: &str| fields.iter().any(|f| f.as_str() == Some(name));
+                EntryFields {
+                    title: has("title"),
+                    tags: has("tags"),
+                    content: has("content"),
+                }
+            }
+            None => EntryFields {
+                title: true,
+                tags: true,
+                content: true,
+            },
+        }
+    }
+
+    fn push_heading(&self, output: &mut String, n: usize, title: &str, filename: &str) {
+        if self.title {
+            output.push_str(&format!("{}. **{}** ({})\n", n, title, filename));
+        } else {
+            output.push_str(&format!("{}. {}\n", n, filename));
+        }
+    }
+
+    fn push_preview(&self, output: &mut String, content: &str) {
+        if !self.content {
+            output.push('\n');
+            return;
+        }
+        let preview = if content.len() > 200 {
+            format!("{}...", &content[..200])
+        } else {
+            content.to_string()
+        };
+        output.push_str(&format!("   {}\n\n", preview));
+    }
+}
+
 async fn handle_broca_journal(
     arguments: &Value,
     root: &Path,
@@ -591,6 +768,50 @@ async fn handle_broca_relate(
     ))
 }
 
+async fn handle_broca_relate_many(
+    arguments: &Value,
+    root: &Path,
+    config: &Config,
+) -> Result<String, Box<dyn Error>> {
+    let edges = arguments
+        .get("edges")
+        .and_then(|v| v.as_array())
+        .ok_or("Missing edges array")?;
+
+    let mut parsed = Vec::with_capacity(edges.len());
+    for (i, edge) in edges.iter().enumerate() {
+        let field = |name: &str| {
+            edge.get(name)
+                .and_then(|v| v.as_str())
+                .map(|s| s.to_string())
+                .ok_or_else(|| format!("Edge {}: missing {}", i + 1, name))
+        };
+        parsed.push((field("from_id")?, field("to_id")?, field("relation_type")?));
+    }
+
+    let memory_dir = root.join(&config.memory.dir);
+    let results = broca::relate_many(&memory_dir, &parsed)?;
+
+    let failures: Vec<String> = results
+        .iter()
+        .enumerate()
+        .filter_map(|(i, r)| r.as_ref().err().map(|e| format!("Edge {}: {}", i + 1, e)))
+        .collect();
+    if !parsed.is_empty() && failures.len() == parsed.len() {
+        return Err(failures.join("\n").into());
+    }
+
+    let mut output = format!(
+        "Created {} of {} relationship(s)",
+        parsed.len() - failures.len(),
+        parsed.len()
+    );
+    for failure in &failures {
+        output.push_str(&format!("\n{}", failure));
+    }
+    Ok(output)
+}
+
 async fn handle_broca_supersede(
     arguments: &Value,
     root: &Path,
@@ -632,6 +853,8 @@ async fn handle_broca_search_tags(
         .and_then(|v| v.as_u64())
         .unwrap_or(10) as usize;
 
+    let fields = EntryFields::from_arguments(arguments);
+
     let memory_dir = root.join(&config.memory.dir);
 
     // Convert JSON array to Vec<String>
@@ -645,36 +868,38 @@ async fn handle_broca_search_tags(
         return Ok("No valid tags provided.".to_string());
     }
 
-    let all_results = broca::search_tag(&memory_dir, &tag_strings[0])?;
+    // Entries must carry every requested tag: filtering here saves clients
+    // from fetching a broad result and intersecting tag lists themselves.
+    let all_results = broca::search_tags(&memory_dir, &tag_strings)?;
     let results: Vec<_> = all_results.iter().take(limit).collect();
+    let tag_label = if tag_strings.len() == 1 {
+        "tag"
+    } else {
+        "tags"
+    };
+    let tag_list = tag_strings.join("', '");
 
     if results.is_empty() {
-        Ok(format!("No memories found with tag: {}", tag_strings[0]))
+        Ok(format!(
+            "No memories found with {}: '{}'",
+            tag_label, tag_list
+        ))
     } else {
         let mut output = format!(
-            "Found {} memory(ies) with tag '{}':\n\n",
+            "Found {} memory(ies) with {} '{}':\n\n",
             results.len(),
-            tag_strings[0]
+            tag_label,
+            tag_list
         );
 
         for (i, entry) in results.iter().enumerate() {
-            output.push_str(&format!(
-                "{}. **{}** ({})\n",
-                i + 1,
-                entry.title,
-                entry.filename
-            ));
+            fields.push_heading(&mut output, i + 1, &entry.title, &entry.filename);
 
-            if !entry.tags.is_empty() {
+            if fields.tags && !entry.tags.is_empty() {
                 output.push_str(&format!("   Tags: {}\n", entry.tags.join(", ")));
             }
 
-            let preview = if entry.content.len() > 200 {
-                format!("{}...", &entry.content[..200])
-            } else {
-                entry.content.clone()
-            };
-            output.push_str(&format!("   {}\n\n", preview));
+            fields.push_preview(&mut output, &entry.content);
         }
 
         Ok(output)
@@ -1124,3 +1349,224 @@ async fn handle_plugin_call(
 
     Ok(result)
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn test_config() -> Config {
+        toml::from_str("[agent]\nname = \"test-agent\"\n").unwrap()
+    }
+
+    async fn reply(payload: &str) -> Option<Value> {
+        let dir = tempfile::tempdir().unwrap();
+        reply_in(dir.path(), payload).await
+    }
+
+    async fn reply_in(root: &Path, payload: &str) -> Option<Value> {
+        handle_payload(payload, root, &test_config())
+            .await
+            .unwrap()
+            .map(|line| serde_json::from_str(&line).unwrap())
+    }
+
+    /// Call a tool and return its `result` object.
+    async fn call_tool(root: &Path, name: &str, arguments: Value) -> Value {
+        let request = json!({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": { "name": name, "arguments": arguments }
+        });
+        let response = reply_in(root, &request.to_string()).await.unwrap();
+        response["result"].clone()
+    }
+
+    fn tool_text(result: &Value) -> &str {
+        result["content"][0]["text"].as_str().unwrap()
+    }
+
+    #[tokio::test]
+    async fn test_batch_replies_to_requests_in_order() {
+        let response = reply(
+            r#"[
+                {"jsonrpc": "2.0", "id": 1, "method": "initialize"},
+                {"jsonrpc": "2.0", "method": "notifications/initialized"},
+                {"jsonrpc": "2.0", "id": "two", "method": "no/such/method"},
+                {"jsonrpc": "2.0", "method": "no/such/notification"},
+                {"jsonrpc": "2.0", "id": 3, "method": "initialize"}
+            ]"#,
+        )
+        .await
+        .unwrap();
+
+        let ids: Vec<&Value> = response
+            .as_array()
+            .unwrap()
+            .iter()
+            .map(|r| &r["id"])
+            .collect();
+        assert_eq!(ids, [&json!(1), &json!("two"), &json!(3)]);
+        assert_eq!(response[1]["error"]["code"], -32601);
+        assert!(response[2]["result"].is_object());
+    }
+
+    #[tokio::test]
+    async fn test_batch_of_notifications_has_no_reply() {
+        let response = reply(
+            r#"[
+                {"jsonrpc": "2.0", "method": "notifications/initialized"},
+                {"jsonrpc": "2.0", "method": "no/such/notification"}
+            ]"#,
+        )
+        .await;
+        assert!(response.is_none());
+    }
+
+    #[tokio::test]
+    async fn test_empty_batch_is_invalid_request() {
+        let response = reply("[]").await.unwrap();
+        assert_eq!(response["error"]["code"], -32600);
+        assert_eq!(response["id"], Value::Null);
+    }
+
+    #[tokio::test]
+    async fn test_non_object_batch_item_is_invalid_request() {
+        let response = reply(r#"[1, {"jsonrpc": "2.0", "id": 7, "method": "initialize"}]"#)
+            .await
+            .unwrap();
+        let response = response.as_array().unwrap();
+        assert_eq!(response.len(), 2);
+        assert_eq!(response[0]["error"]["code"], -32600);
+        assert!(response[0].as_object().unwrap().contains_key("id"));
+        assert_eq!(response[0]["id"], Value::Null);
+        assert_eq!(response[1]["id"], 7);
+    }
+
+    #[tokio::test]
+    async fn test_unparseable_line_is_parse_error() {
+        let response = reply(r#"{"jsonrpc": "2.0", "id": 1,"#).await.unwrap();
+        assert_eq!(response["error"]["code"], -32700);
+        assert_eq!(response["id"], Value::Null);
+    }
+
+    #[tokio::test]
+    async fn test_remember_returns_structured_id() {
+        let dir = tempfile::tempdir().unwrap();
+        let result = call_tool(
+            dir.path(),
+            "broca_remember",
+            json!({ "content": "Pipes are 64 KiB by default", "title": "Pipe size" }),
+        )
+        .await;
+
+        assert_eq!(result["isError"], false);
+        let id = result["structuredContent"]["id"].as_str().unwrap();
+        assert_eq!(tool_text(&result), format!("Stored memory with ID: {id}"));
+        assert!(dir
+            .path()
+            .join("memory/knowledge")
+            .join(format!("{id}.md"))
+            .is_file());
+    }
+
+    #[tokio::test]
+    async fn test_remember_error_has_no_structured_content() {
+        let dir = tempfile::tempdir().unwrap();
+        let result = call_tool(
+            dir.path(),
+            "broca_remember",
+            json!({ "title": "No content" }),
+        )
+        .await;
+
+        assert_eq!(result["isError"], true);
+        assert!(result.get("structuredContent").is_none());
+    }
+
+    async fn remember_fixture(root: &Path) -> String {
+        let result = call_tool(
+            root,
+            "broca_remember",
+            json!({
+                "content": "Quantum error correction needs many physical qubits",
+                "title": "Qubit overhead",
+                "tags": ["quantum", "analysis"],
+                "valid_until": "2020-01-01"
+            }),
+        )
+        .await;
+        result["structuredContent"]["id"]
+            .as_str()
+            .unwrap()
+            .to_string()
+    }
+
+    #[tokio::test]
+    async fn test_fields_projection_keeps_id_and_freshness() {
+        let dir = tempfile::tempdir().unwrap();
+        let id = remember_fixture(dir.path()).await;
+
+        let result = call_tool(
+            dir.path(),
+            "broca_recall",
+            json!({ "query": "quantum", "fields": ["id", "tags"] }),
+        )
+        .await;
+        let text = tool_text(&result);
+        assert!(text.contains(&format!("1. {id}.md\n")), "{text}");
+        assert!(text.contains("Tags: quantum, analysis"), "{text}");
+        assert!(text.contains("Valid until: 2020-01-01"), "{text}");
+        assert!(text.contains("Stale:"), "{text}");
+        assert!(!text.contains("Qubit overhead"), "{text}");
+        assert!(!text.contains("physical qubits"), "{text}");
+
+        let result = call_tool(
+            dir.path(),
+            "broca_search_tags",
+            json!({ "tags": ["quantum"], "fields": ["id"] }),
+        )
+        .await;
+        let text = tool_text(&result);
+        assert!(text.contains(&format!("1. {id}.md\n")), "{text}");
+        assert!(!text.contains("Tags:"), "{text}");
+        assert!(!text.contains("Qubit overhead"), "{text}");
+        assert!(!text.contains("physical qubits"), "{text}");
+    }
+
+    #[tokio::test]
+    async fn test_default_fields_show_everything() {
+        let dir = tempfile::tempdir().unwrap();
+        let id = remember_fixture(dir.path()).await;
+
+        let result = call_tool(dir.path(), "broca_recall", json!({ "query": "quantum" })).await;
+        let text = tool_text(&result);
+        assert!(
+            text.contains(&format!("1. **Qubit overhead** ({id}.md)")),
+            "{text}"
+        );
+        assert!(text.contains("Tags: quantum, analysis"), "{text}");
+        assert!(text.contains("Stale:"), "{text}");
+        assert!(
+            text.contains("   Quantum error correction needs many physical qubits"),
+            "{text}"
+        );
+
+        let result = call_tool(
+            dir.path(),
+            "broca_search_tags",
+            json!({ "tags": ["quantum"] }),
+        )
+        .await;
+        let text = tool_text(&result);
+        assert!(
+            text.contains(&format!("1. **Qubit overhead** ({id}.md)")),
+            "{text}"
+        );
+        assert!(text.contains("Tags: quantum, analysis"), "{text}");
+        assert!(
+            text.contains("   Quantum error correction needs many physical qubits"),
+            "{text}"
+        );
+    }
+}